@@ -4,14 +4,22 @@
 import subprocess
 import time
 import os
+import re
 import sys
+import shutil
+import platform
 import tempfile
 import socket
 import select
 import threading
 import signal
+import asyncio
+import contextlib
+import http.client
 import psutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlsplit
 
 # Colors for output
 RED = '\033[91m'
@@ -21,12 +29,117 @@ BLUE = '\033[94m'
 MAGENTA = '\033[95m'
 RESET = '\033[0m'
 
+# I/O multiplexing syscalls watched while the server is running
+MUX_SYSCALLS = ["epoll_wait", "epoll_pwait", "epoll_ctl", "poll", "ppoll", "select", "pselect6"]
+
+# Syscall numbers for the /proc/<pid>/syscall fallback, per architecture
+MUX_SYSCALL_NUMBERS = {
+    "x86_64": {7: "poll", 23: "select", 232: "epoll_wait", 233: "epoll_ctl",
+               270: "pselect6", 271: "ppoll", 281: "epoll_pwait", 441: "epoll_pwait2"},
+    "aarch64": {21: "epoll_ctl", 22: "epoll_pwait", 72: "pselect6", 73: "ppoll", 441: "epoll_pwait2"},
+}
+
+# Concurrent keep-alive clients in the stress test, siege's default
+STRESS_CONCURRENCY = 25
+
+# Idle keep-alive connections kept open per host:port between probes
+MAX_IDLE_CONNECTIONS = 50
+
+# Patterns compiled once and reused by every scan
+DIRECTIVE_RE = re.compile(r'^\s*(server|host|listen)\b\s*([^;{\s]*)', re.M)
+PERF_COUNT_RE = re.compile(r'^(\d+),[^,]*,syscalls:sys_enter_(\w+)', re.M)
+
+# Configs written to temp files by the sections, encoded once at import
+MULTI_PORT_CONFIG = b"""
+server {
+    host 127.0.0.1;
+    listen 8080;
+    server_name server1;
+    root ./www/;
+    
+    location / {
+        index index.html;
+        allowed_methods GET;
+    }
+}
+
+server {
+    host 127.0.0.1;
+    listen 8081;
+    server_name server2;
+    root ./www/;
+    
+    location / {
+        index dashboard.html;
+        allowed_methods GET;
+    }
+}
+"""
+
+DUPLICATE_LISTEN_CONFIG = b"""
+server {
+    host 127.0.0.1;
+    listen 8080;
+    listen 8080;
+    server_name test;
+    root ./www/;
+    
+    location / {
+        index index.html;
+        allowed_methods GET;
+    }
+}
+"""
+
+SHARED_PORT_CONFIG_1 = b"""
+server {
+    host 127.0.0.1;
+    listen 7777;
+    server_name test1;
+    root ./www/;
+    
+    location / {
+        index index.html;
+        allowed_methods GET;
+    }
+}
+"""
+
+SHARED_PORT_CONFIG_2 = b"""
+server {
+    host 127.0.0.1;
+    listen 7777;
+    server_name test2;
+    root ./www/;
+    
+    location / {
+        index index.html;
+        allowed_methods GET;
+    }
+}
+"""
+
 class WebservCorrectionTester:
     def __init__(self, binary_path="./webserv", config_path="config/example.conf"):
         self.binary_path = binary_path
         self.config_path = config_path
         self.server_process = None
         self.test_results = []
+        # Where the main config listens, parsed once and used by every probe
+        self.listens = self._parse_listens(config_path) or [("127.0.0.1", 8888)]
+        self.host, self.port = self.listens[0]
+        self.base_url = f"http://{self.host}:{self.port}"
+        # Project files the sections look for, resolved once against the starting directory
+        self.repo_root = Path.cwd()
+        self.has_python_cgi = (self.repo_root / "www/cgi-bin/lotr.py").is_file()
+        self.has_shell_cgi = (self.repo_root / "www/cgi-bin/star_wars.sh").is_file()
+        self.has_makefile = (self.repo_root / "Makefile").is_file()
+        # Idle keep-alive connections per (host, port), reused across probes
+        self._idle = {}
+        self._idle_lock = threading.Lock()
+        # Independent probes are issued concurrently through this pool,
+        # it and the connections above live for the whole run
+        self.pool = ThreadPoolExecutor(max_workers=8)
         
     def print_section(self, section_name):
         print(f"\n{MAGENTA}{'='*60}{RESET}")
@@ -39,6 +152,150 @@ class WebservCorrectionTester:
         if details:
             print(f"        {YELLOW}{details}{RESET}")
     
+    def _parse_listens(self, config_path):
+        """(host, port) of every listen directive in a config file"""
+        with open(config_path) as f:
+            config = f.read()
+        
+        listens = []
+        host = "127.0.0.1"
+        for directive, value in DIRECTIVE_RE.findall(config):
+            if directive == "server":
+                host = "127.0.0.1"
+            elif directive == "host":
+                # A wildcard bind is still reached through loopback
+                host = "127.0.0.1" if value == "0.0.0.0" else value
+            else:
+                listen_host, _, port = value.rpartition(":")
+                listens.append((listen_host or host, int(port)))
+        return listens
+    
+    def _wait_ready(self, host, port, process=None, timeout=5.0):
+        """Poll until host:port accepts connections, False if it never does or the process exits"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                return False
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.settimeout(0.05)
+                if s.connect_ex((host, port)) == 0:
+                    return True
+            time.sleep(0.02)
+        return False
+    
+    def _wait_for_server(self, config_path, process=None):
+        """Wait until every port of config_path is accepting connections, False as soon as one never does"""
+        return all(self._wait_ready(host, port, process) for host, port in self._parse_listens(config_path))
+    
+    def _write_config(self, config):
+        """Write config bytes straight to a new temp file, return its path"""
+        fd, path = tempfile.mkstemp(suffix='.conf')
+        os.write(fd, config)
+        os.close(fd)
+        return path
+    
+    @contextlib.contextmanager
+    def _server(self, config_path=None):
+        """Run webserv with config_path (the main config by default) for the duration of the block,
+        RuntimeError if it exits or never listens on its ports"""
+        config_path = config_path or self.config_path
+        # Nobody reads the server's output, a full pipe would block a long-lived server
+        process = subprocess.Popen([self.binary_path, config_path],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not self._wait_for_server(config_path, process):
+                raise RuntimeError(f"webserv did not start with {config_path}")
+            yield process
+        finally:
+            self._stop(process)
+    
+    def _stop(self, process, timeout=2):
+        """SIGTERM a server we started, SIGKILL it if it hasn't exited within timeout"""
+        if process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    
+    def _checkout(self, host, port):
+        """Take an idle connection to host:port from the pool, or open a new one"""
+        with self._idle_lock:
+            idle = self._idle.get((host, port))
+            if idle:
+                return idle.pop(), True
+        return http.client.HTTPConnection(host, port, timeout=5), False
+    
+    def _checkin(self, conn):
+        """Return a connection to the pool so the next probe skips the handshake, up to MAX_IDLE_CONNECTIONS"""
+        with self._idle_lock:
+            idle = self._idle.setdefault((conn.host, conn.port), [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(conn)
+                return
+        conn.close()
+    
+    def _open(self, method, url, body=None, headers=None, fresh=False):
+        """Send a request over a pooled keep-alive connection (a new one if fresh), return (response, body) or (None, b"")"""
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        
+        if fresh:
+            conn, reused = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=5), False
+        else:
+            conn, reused = self._checkout(parts.hostname, parts.port or 80)
+        try:
+            conn.request(method, target, body=body, headers=headers or {})
+            response = conn.getresponse()
+            data = response.read()
+        except TimeoutError:
+            # A slow reply is the server's, not a stale connection, don't send it again
+            conn.close()
+            return None, b""
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            # The server may have dropped an idle connection, retry once on a fresh one
+            if reused:
+                return self._open(method, url, body, headers, fresh=True)
+            return None, b""
+        
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+        return response, data
+    
+    def _close_idle(self, host, port):
+        """Close the pooled connections to host:port"""
+        with self._idle_lock:
+            idle = self._idle.pop((host, port), [])
+        for conn in idle:
+            conn.close()
+    
+    def _close(self):
+        """Close every pooled connection and stop the probe workers"""
+        self.pool.shutdown()
+        for host, port in list(self._idle):
+            self._close_idle(host, port)
+    
+    def _request(self, method, url, body=None, headers=None):
+        """Send a request over a pooled keep-alive connection, return (status, text, headers)"""
+        response, data = self._open(method, url, body, headers)
+        if response is None:
+            return 0, "", http.client.HTTPMessage()
+        return response.status, data.decode(errors="replace"), response.headers
+    
+    def _get(self, url, headers=None):
+        return self._request("GET", url, headers=headers)
+    
+    def _post(self, url, data):
+        # Same default content type curl uses for -d / --data-binary
+        return self._request("POST", url, body=data,
+                             headers={"Content-Type": "application/x-www-form-urlencoded"})
 
 
     def check_memory_leaks(self):
@@ -65,36 +322,55 @@ class WebservCorrectionTester:
         
 #         try:
 #             # Run server with valgrind
-#             cmd = f"valgrind --leak-check=full --show-leak-kinds=all {self.binary_path} {config_path}"
-#             process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, 
-#                                      stderr=subprocess.STDOUT, text=True)
+#             cmd = ["valgrind", "--leak-check=full", "--show-leak-kinds=all", self.binary_path, config_path]
+#             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, 
+#                                      stderr=subprocess.STDOUT, text=True, bufsize=1)
             
 #             # Let it run for a bit
 #             time.sleep(3)
             
 #             # Send some requests
-#             subprocess.run("curl http://127.0.0.1:8080/ > /dev/null 2>&1", shell=True)
-#             subprocess.run("curl -X POST -d 'test' http://127.0.0.1:8080/ > /dev/null 2>&1", shell=True)
+#             self._get("http://127.0.0.1:8080/")
+#             self._post("http://127.0.0.1:8080/", "test")
             
 #             time.sleep(1)
             
 #             # Stop server gracefully
 #             process.send_signal(signal.SIGTERM)
-#             output, _ = process.communicate(timeout=5)
+#             # Scan the output line by line as it arrives and stop at the summary
+#             # rather than waiting for the whole log
+#             clean_lines = ("definitely lost: 0 bytes", "indirectly lost: 0 bytes")
+#             seen = set()
+#             lost_lines = []
+            
+#             def scan():
+#                 for line in process.stdout:
+#                     if "All heap blocks were freed" in line:
+#                         # Valgrind skips the per-kind summary when nothing leaked
+#                         seen.update(clean_lines)
+#                     elif "lost" in line.lower():
+#                         lost_lines.append(line.rstrip())
+#                         seen.update(clean for clean in clean_lines if clean in line)
+#                     if len(seen) == len(clean_lines):
+#                         return
+            
+#             reader = threading.Thread(target=scan, daemon=True)
+#             reader.start()
+#             reader.join(5)
+#             no_leaks = len(seen) == len(clean_lines)
             
 #             # Check for leaks in output
-#             if "definitely lost: 0 bytes" in output and "indirectly lost: 0 bytes" in output:
+#             if no_leaks:
 #                 self.print_test("No memory leaks detected", True)
 #                 return True
-#         #     elif "valgrind" not in output:
+#         #     elif shutil.which("valgrind") is None:
 #         #         self.print_test("Valgrind check", False, "Valgrind not available, skipping memory test")
 #         #         return None
 #         #     else:
 #         #         self.print_test("Memory leaks detected", False)
 #         #         print(f"{RED}Valgrind output:{RESET}")
-#         #         for line in output.split('\n'):
-#         #             if 'lost' in line.lower():
-#         #                 print(f"  {line}")
+#         #         for line in lost_lines:
+#         #             print(f"  {line}")
 #         #         return False
                 
 #         # except Exception as e:
@@ -102,42 +378,79 @@ class WebservCorrectionTester:
 #         #     return False
 #         finally:
 #             os.unlink(config_path)
-#             subprocess.run(["pkill", "-f", self.binary_path], capture_output=True)
+#             self._stop(process)
    
 
+    def _count_mux_syscalls(self, pid, duration=2):
+        """Count multiplexing syscalls of pid with perf tracepoints, None if perf can't"""
+        if shutil.which("perf") is None:
+            return None
+        
+        events = ",".join(f"syscalls:sys_enter_{name}" for name in MUX_SYSCALLS)
+        perf = subprocess.Popen(["perf", "stat", "-x,", "-e", events, "-p", str(pid), "sleep", str(duration)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        # Keep the event loop busy, a server parked in a single wait would count nothing
+        for _ in range(4):
+            time.sleep(duration / 5)
+            self._get(f"{self.base_url}/")
+        _, output = perf.communicate()
+        if perf.returncode != 0:
+            return None
+        
+        # "<not counted>" / "<not supported>" rows don't match and are left out
+        counts = {name: int(count) for count, name in PERF_COUNT_RE.findall(output)}
+        return counts or None
+    
+    def _sample_mux_syscalls(self, pid, duration=2):
+        """Sample /proc/<pid>/syscall for multiplexing syscalls, None if unreadable"""
+        numbers = MUX_SYSCALL_NUMBERS.get(platform.machine())
+        if numbers is None:
+            return None
+        
+        counts = {}
+        deadline = time.monotonic() + duration
+        try:
+            while time.monotonic() < deadline:
+                with open(f"/proc/{pid}/syscall") as f:
+                    nr = f.read().split(" ", 1)[0]
+                # "running" while on a CPU, otherwise the number of the blocking syscall
+                if nr.isdigit() and int(nr) in numbers:
+                    name = numbers[int(nr)]
+                    counts[name] = counts.get(name, 0) + 1
+                time.sleep(0.01)
+        except OSError:
+            return None
+        return counts
+    
     def test_io_multiplexing(self):
         """Test that epoll is used correctly"""
         self.print_section("I/O MULTIPLEXING CHECK - EPOLL")
         
-        # Start server
-        self.server_process = subprocess.Popen(
-            [self.binary_path, self.config_path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        time.sleep(2)
-        
         try:
             pid = self.server_process.pid
             
-            # Monitor epoll calls specifically
-            strace_cmd = f"timeout 2 strace -p {pid} 2>&1 | grep -E 'epoll_(create|wait|ctl)'"
-            result = subprocess.run(strace_cmd, shell=True, capture_output=True, text=True)
+            # Count syscalls passively, strace would stop the server on every one of them
+            counts = self._count_mux_syscalls(pid)
+            source = "perf"
+            if counts is None:
+                counts = self._sample_mux_syscalls(pid)
+                source = "/proc samples"
+            if counts is None:
+                self.print_test("EPOLL test", False, "Neither perf nor /proc/<pid>/syscall available")
+                return False
             
-            if "epoll" in result.stdout:
-                epoll_calls = result.stdout.count("epoll")
-                self.print_test("EPOLL detected", True, f"Found {epoll_calls} epoll calls")
+            epoll_calls = sum(n for name, n in counts.items() if name.startswith("epoll"))
+            if epoll_calls:
+                self.print_test("EPOLL detected", True, f"Found {epoll_calls} epoll calls ({source})")
                 return True
             else:
-                self.print_test("EPOLL not detected", False)
+                others = ", ".join(f"{name}: {n}" for name, n in counts.items() if n) or "none"
+                self.print_test("EPOLL not detected", False, f"Other multiplexing calls: {others}")
                 return False
                 
         except Exception as e:
             self.print_test("EPOLL test", False, f"Error: {e}")
             return False
-        finally:
-            self.server_process.terminate()
-            self.server_process.wait()
 
 
     # def test_io_multiplexing(self):
@@ -159,8 +472,8 @@ class WebservCorrectionTester:
     #         # Check system calls using strace (Linux) or similar
     #         if sys.platform == "linux":
     #             # Monitor system calls for a short time
-    #             strace_cmd = f"timeout 2 strace -p {pid} 2>&1"
-    #             result = subprocess.run(strace_cmd, shell=True, capture_output=True, text=True)
+    #             strace_cmd = ["timeout", "2", "strace", "-p", str(pid)]
+    #             result = subprocess.run(strace_cmd, capture_output=True, text=True)
                 
     #             # Check for select/poll/epoll
     #             syscalls = result.stdout + result.stderr
@@ -195,107 +508,60 @@ class WebservCorrectionTester:
         tests_passed = []
         
         # Test 1: Multiple servers with different ports
-        config1 = """
-server {
-    host 127.0.0.1;
-    listen 8080;
-    server_name server1;
-    root ./www/;
-    
-    location / {
-        index index.html;
-        allowed_methods GET;
-    }
-}
-
-server {
-    host 127.0.0.1;
-    listen 8081;
-    server_name server2;
-    root ./www/;
-    
-    location / {
-        index dashboard.html;
-        allowed_methods GET;
-    }
-}
-"""
-        fd, path = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd, 'w') as f:
-            f.write(config1)
+        path = self._write_config(MULTI_PORT_CONFIG)
         
-        # Start server with multi-port config
-        server = subprocess.Popen([self.binary_path, path], 
-                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
-        # Test both ports
-        r1 = subprocess.run("curl -s http://127.0.0.1:8080/", shell=True, 
-                          capture_output=True, text=True)
-        r2 = subprocess.run("curl -s http://127.0.0.1:8081/", shell=True,
-                          capture_output=True, text=True)
+        # Start a dedicated server with the multi-port config
+        try:
+            with self._server(path):
+                # Test both ports
+                _, text1, _ = self._get("http://127.0.0.1:8080/")
+                _, text2, _ = self._get("http://127.0.0.1:8081/")
+        finally:
+            # Its pooled connections die with it
+            self._close_idle("127.0.0.1", 8080)
+            self._close_idle("127.0.0.1", 8081)
+            os.unlink(path)
         
-        test_passed = "Welcome" in r1.stdout and "Dashboard" in r2.stdout
+        test_passed = "Welcome" in text1 and "Dashboard" in text2
         self.print_test("Multiple servers with different ports", test_passed)
         tests_passed.append(test_passed)
         
-        server.terminate()
-        server.wait()
-        os.unlink(path)
-        time.sleep(1)
-        
         # Test 2: Different hostnames
-        self.server_process = subprocess.Popen([self.binary_path, self.config_path],
-                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
-        result = subprocess.run(
-            "curl --resolve example.com:8888:127.0.0.1 http://example.com:8888/",
-            shell=True, capture_output=True, text=True
-        )
-        test_passed = result.returncode == 0 and len(result.stdout) > 0
+        # Connect to the configured host but present example.com as the virtual host
+        status, text, _ = self._get(f"{self.base_url}/", headers={"Host": f"example.com:{self.port}"})
+        test_passed = status != 0 and len(text) > 0
         self.print_test("Different hostnames support", test_passed)
         tests_passed.append(test_passed)
         
         # # Test 3: Custom error pages
-        # result = subprocess.run("curl -s http://127.0.0.1:8888/nonexistent",
-        #                       shell=True, capture_output=True, text=True)
-        # test_passed = "404" in result.stdout
+        # _, text, _ = self._get(f"{self.base_url}/nonexistent")
+        # test_passed = "404" in text
         # self.print_test("Custom error pages", test_passed)
         # tests_passed.append(test_passed)
         
         # # Test 4: Client body limit
-        # large_data = "X" * 60000  # Larger than 50000 limit
-        # result = subprocess.run(
-        #     f"curl -s -o /dev/null -w '%{{http_code}}' -X POST -H 'Content-Type: text/plain' --data '{large_data}' http://127.0.0.1:8888/methods",
-        #     shell=True, capture_output=True, text=True
-        # )
-        # test_passed = "413" in result.stdout
+        # large_data = b"X" * 60000  # Larger than 50000 limit
+        # status, _, _ = self._request("POST", f"{self.base_url}/methods", body=large_data,
+        #                              headers={"Content-Type": "text/plain"})
+        # test_passed = status == 413
         # self.print_test("Client body size limit", test_passed)
         # tests_passed.append(test_passed)
         
         # Test 5: Different routes
         routes = ["/", "/dashboard", "/methods", "/cgi-bin/"]
-        route_results = []
-        for route in routes:
-            result = subprocess.run(f"curl -s -o /dev/null -w '%{{http_code}}' http://127.0.0.1:8888{route}",
-                                  shell=True, capture_output=True, text=True)
-            route_results.append("200" in result.stdout or "404" in result.stdout)
+        # Back to back on one pooled keep-alive socket, four tiny GETs don't need four sockets
+        route_results = [self._get(f"{self.base_url}{route}")[0] in (200, 404) for route in routes]
         test_passed = all(route_results)
         self.print_test("Multiple routes configuration", test_passed)
         tests_passed.append(test_passed)
         
         # Test 6: Method restrictions
         # DELETE should be forbidden on /
-        result = subprocess.run("curl -s -o /dev/null -w '%{http_code}' -X DELETE http://127.0.0.1:8888/",
-                              shell=True, capture_output=True, text=True)
-        test_passed = "403" in result.stdout or "405" in result.stdout
+        status, _, _ = self._request("DELETE", f"{self.base_url}/")
+        test_passed = status in (403, 405)
         self.print_test("Method restrictions", test_passed)
         tests_passed.append(test_passed)
         
-        self.server_process.terminate()
-        self.server_process.wait()
-        
         return all(tests_passed)
     
 
@@ -304,65 +570,51 @@ server {
         """Test basic HTTP functionality"""
         self.print_section("BASIC FUNCTIONALITY CHECKS")
         
-        # Start server
-        self.server_process = subprocess.Popen([self.binary_path, self.config_path],
-                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
         tests_passed = []
         
+        # GET, POST and UNKNOWN don't depend on each other, send them together
+        get_probe = self.pool.submit(self._get, f"{self.base_url}/")
+        post_probe = self.pool.submit(self._post, f"{self.base_url}/methods", "test")
+        unknown_probe = self.pool.submit(self._request, "UNKNOWN", f"{self.base_url}/")
+        
         # Test GET request
-        result = subprocess.run("curl -s -o /dev/null -w '%{http_code}' http://127.0.0.1:8888/",
-                              shell=True, capture_output=True, text=True)
-        test_passed = "200" in result.stdout
+        status, _, _ = get_probe.result()
+        test_passed = status == 200
         self.print_test("GET request", test_passed)
         tests_passed.append(test_passed)
         
         # Test POST request
-        result = subprocess.run("curl -s -o /dev/null -w '%{http_code}' -X POST -d 'test' http://127.0.0.1:8888/methods",
-                              shell=True, capture_output=True, text=True)
-        test_passed = "201" in result.stdout or "200" in result.stdout
+        status, _, _ = post_probe.result()
+        test_passed = status in (200, 201)
         self.print_test("POST request", test_passed)
         tests_passed.append(test_passed)
         
         # Test DELETE request
-        # First create a file to delete
-        subprocess.run("curl -X POST -d 'test_delete' http://127.0.0.1:8888/methods", 
-                      shell=True, capture_output=True)
+        # First create a file to delete, the DELETE has to wait for it
+        self._post(f"{self.base_url}/methods", "test_delete")
         time.sleep(1)
         
         # Try to delete (may need to adjust based on actual implementation)
-        result = subprocess.run("curl -s -o /dev/null -w '%{http_code}' -X DELETE http://127.0.0.1:8888/uploads/file.txt",
-                              shell=True, capture_output=True, text=True)
-        test_passed = result.stdout.strip() in ["200", "204", "404"]  # 404 if file doesn't exist
+        status, _, _ = self._request("DELETE", f"{self.base_url}/uploads/file.txt")
+        test_passed = status in (200, 204, 404)  # 404 if file doesn't exist
         self.print_test("DELETE request", test_passed)
         tests_passed.append(test_passed)
         
         # Test UNKNOWN method (should not crash)
-        result = subprocess.run("curl -s -o /dev/null -w '%{http_code}' -X UNKNOWN http://127.0.0.1:8888/",
-                              shell=True, capture_output=True, text=True)
-        test_passed = result.stdout.strip() in ["400", "405", "501"]
+        status, _, _ = unknown_probe.result()
+        test_passed = status in (400, 405, 501)
         self.print_test("UNKNOWN request handling", test_passed)
         tests_passed.append(test_passed)
         
         # Test file upload and retrieval
-        test_content = "This is a test file for upload"
-        fd, filepath = tempfile.mkstemp()
-        with os.fdopen(fd, 'w') as f:
-            f.write(test_content)
+        test_content = b"This is a test file for upload"
         
         # Upload file
-        result = subprocess.run(f"curl -s -o /dev/null -w '%{{http_code}}' -X POST --data-binary '@{filepath}' http://127.0.0.1:8888/methods",
-                              shell=True, capture_output=True, text=True)
-        test_passed = "201" in result.stdout or "200" in result.stdout
+        status, _, _ = self._post(f"{self.base_url}/methods", test_content)
+        test_passed = status in (200, 201)
         self.print_test("File upload", test_passed)
         tests_passed.append(test_passed)
         
-        os.unlink(filepath)
-        
-        self.server_process.terminate()
-        self.server_process.wait()
-        
         return all(tests_passed)
     
 
@@ -371,63 +623,38 @@ server {
         """Test CGI functionality"""
         self.print_section("CGI TESTS")
         
-        # Start server
-        self.server_process = subprocess.Popen([self.binary_path, self.config_path],
-                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
         tests_passed = []
         
         # Test CGI with GET
-        result = subprocess.run("curl -s http://127.0.0.1:8888/cgi-bin/lotr",
-                              shell=True, capture_output=True, text=True)
-        test_passed = len(result.stdout) > 0 and "Archives" in result.stdout
+        _, text, _ = self._get(f"{self.base_url}/cgi-bin/lotr")
+        test_passed = len(text) > 0 and "Archives" in text
         self.print_test("CGI GET request (Python)", test_passed)
         tests_passed.append(test_passed)
         
         # Test CGI with POST
-        result = subprocess.run("curl -s -X POST -d 'username=test&message=hello' http://127.0.0.1:8888/cgi-bin/lotr",
-                              shell=True, capture_output=True, text=True)
-        test_passed = len(result.stdout) > 0
+        _, text, _ = self._post(f"{self.base_url}/cgi-bin/lotr", "username=test&message=hello")
+        test_passed = len(text) > 0
         self.print_test("CGI POST request (Python)", test_passed)
         tests_passed.append(test_passed)
         
         # Test shell CGI
-        result = subprocess.run("curl -s http://127.0.0.1:8888/cgi-bin/star-wars",
-                              shell=True, capture_output=True, text=True)
-        test_passed = len(result.stdout) > 0 and "Terminal" in result.stdout
+        _, text, _ = self._get(f"{self.base_url}/cgi-bin/star-wars")
+        test_passed = len(text) > 0 and "Terminal" in text
         self.print_test("CGI GET request (Shell)", test_passed)
         tests_passed.append(test_passed)
         
         # Test CGI with query string
-        result = subprocess.run("curl -s 'http://127.0.0.1:8888/cgi-bin/lotr?action=time'",
-                              shell=True, capture_output=True, text=True)
-        test_passed = len(result.stdout) > 0
+        _, text, _ = self._get(f"{self.base_url}/cgi-bin/lotr?action=time")
+        test_passed = len(text) > 0
         self.print_test("CGI with query string", test_passed)
         tests_passed.append(test_passed)
         
         # Test CGI error handling (infinite loop simulation)
-        # Create a bad CGI script
-        bad_cgi = """#!/usr/bin/env python3
-import time
-while True:
-    time.sleep(1)
-"""
-        fd, bad_cgi_path = tempfile.mkstemp(suffix='.py')
-        with os.fdopen(fd, 'w') as f:
-            f.write(bad_cgi)
-        os.chmod(bad_cgi_path, 0o755)
-        
-        # This should timeout or handle gracefully
-        # Note: May need to adjust based on actual implementation
+        # This should timeout or handle gracefully, the server only runs
+        # scripts under its own root so it has to be checked by hand
         self.print_test("CGI error handling", True, "Manual verification needed for timeout behavior")
         tests_passed.append(True)
         
-        os.unlink(bad_cgi_path)
-        
-        self.server_process.terminate()
-        self.server_process.wait()
-        
         return all(tests_passed)
     
 
@@ -436,39 +663,29 @@ while True:
         """Test browser compatibility"""
         self.print_section("BROWSER COMPATIBILITY")
         
-        # Start server
-        self.server_process = subprocess.Popen([self.binary_path, self.config_path],
-                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
         tests_passed = []
         
         # Test serving static website
-        result = subprocess.run("curl -s -I http://127.0.0.1:8888/",
-                              shell=True, capture_output=True, text=True)
+        response, _ = self._open("HEAD", f"{self.base_url}/")
         
         # Check for proper headers
-        has_content_type = "Content-Type:" in result.stdout
-        has_content_length = "Content-Length:" in result.stdout
-        has_http_version = "HTTP/1.1" in result.stdout
-        
-        test_passed = has_content_type and has_content_length and has_http_version
+        test_passed = (response is not None and response.version == 11
+                       and response.getheader("Content-Type") is not None
+                       and response.getheader("Content-Length") is not None)
         self.print_test("HTTP headers present", test_passed)
         tests_passed.append(test_passed)
         
         # Test wrong URL
-        result = subprocess.run("curl -s -o /dev/null -w '%{http_code}' http://127.0.0.1:8888/nonexistent",
-                              shell=True, capture_output=True, text=True)
-        test_passed = "404" in result.stdout
+        status, _, _ = self._get(f"{self.base_url}/nonexistent")
+        test_passed = status == 404
         self.print_test("404 on wrong URL", test_passed)
         tests_passed.append(test_passed)
         
         # Test directory listing
-        result = subprocess.run("curl -s http://127.0.0.1:8888/uploads/",
-                              shell=True, capture_output=True, text=True)
-        test_passed = len(result.stdout) > 0
+        _, text, _ = self._get(f"{self.base_url}/uploads/")
+        test_passed = len(text) > 0
         self.print_test("Directory listing", test_passed, 
-                       "Autoindex on" if "Directory" in result.stdout else "Autoindex off or 404")
+                       "Autoindex on" if "Directory" in text else "Autoindex off or 404")
         tests_passed.append(True)  # Both behaviors are acceptable
         
         # Test static files
@@ -478,16 +695,15 @@ while True:
             "/index.html"
         ]
         
+        probes = {self.pool.submit(self._get, f"{self.base_url}{file}"): file
+                  for file in static_files}
+        statuses = {probes[probe]: probe.result()[0] for probe in as_completed(probes)}
+        
         for file in static_files:
-            result = subprocess.run(f"curl -s -o /dev/null -w '%{{http_code}}' http://127.0.0.1:8888{file}",
-                                  shell=True, capture_output=True, text=True)
-            test_passed = "200" in result.stdout or "404" in result.stdout
+            test_passed = statuses[file] in (200, 404)
             self.print_test(f"Static file: {file}", test_passed)
             tests_passed.append(test_passed)
         
-        self.server_process.terminate()
-        self.server_process.wait()
-        
         return all(tests_passed)
     
 
@@ -499,23 +715,7 @@ while True:
         tests_passed = []
         
         # Test 1: Same port multiple times in config (should fail)
-        bad_config = """
-server {
-    host 127.0.0.1;
-    listen 8080;
-    listen 8080;
-    server_name test;
-    root ./www/;
-    
-    location / {
-        index index.html;
-        allowed_methods GET;
-    }
-}
-"""
-        fd, path = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd, 'w') as f:
-            f.write(bad_config)
+        path = self._write_config(DUPLICATE_LISTEN_CONFIG)
         
         result = subprocess.run([self.binary_path, path], 
                               capture_output=True, text=True, timeout=2)
@@ -525,61 +725,30 @@ server {
         os.unlink(path)
         
         # Test 2: Multiple servers with common ports (should fail)
-        config1 = """
-server {
-    host 127.0.0.1;
-    listen 7777;
-    server_name test1;
-    root ./www/;
-    
-    location / {
-        index index.html;
-        allowed_methods GET;
-    }
-}
-"""
-        config2 = """
-server {
-    host 127.0.0.1;
-    listen 7777;
-    server_name test2;
-    root ./www/;
-    
-    location / {
-        index index.html;
-        allowed_methods GET;
-    }
-}
-"""
-        
-        fd1, path1 = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd1, 'w') as f:
-            f.write(config1)
-        
-        fd2, path2 = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd2, 'w') as f:
-            f.write(config2)
+        path1 = self._write_config(SHARED_PORT_CONFIG_1)
+        path2 = self._write_config(SHARED_PORT_CONFIG_2)
         
         # Start first server
         server1 = subprocess.Popen([self.binary_path, path1],
                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
+        self._wait_for_server(path1, server1)
         
         # Try to start second server (should fail)
         server2 = subprocess.Popen([self.binary_path, path2],
                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
+        # Give it a chance to fail, returns as soon as it exits
+        try:
+            server2.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
         
         # Check if second server failed to start
         test_passed = server2.poll() is not None  # Should have exited
         self.print_test("Prevent binding to same port twice", test_passed)
         tests_passed.append(test_passed)
         
-        server1.terminate()
-        server1.wait()
-        if server2.poll() is None:
-            server2.terminate()
-            server2.wait()
+        self._stop(server1)
+        self._stop(server2)
         
         os.unlink(path1)
         os.unlink(path2)
@@ -588,38 +757,90 @@ server {
 
 
 
+    async def _fetch(self, reader, writer, request):
+        """Send one request on an open connection and read the full response, return (status, keep alive)"""
+        writer.write(request)
+        try:
+            status_line = await reader.readline()
+        except ConnectionError:
+            status_line = b""
+        if not status_line:
+            # Closed before answering, status None so the caller can resend on a fresh connection
+            return None, False
+        status = int(status_line.split()[1])
+        
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+        
+        if "content-length" in headers:
+            await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            while (size := int((await reader.readline()).split(b";")[0], 16)):
+                await reader.readexactly(size + 2)
+            await reader.readline()
+        else:
+            # No length, the body runs until the server closes
+            await reader.read()
+            return status, False
+        return status, headers.get("connection") != "close"
+    
+    async def _flood(self, host, port, duration, concurrency=STRESS_CONCURRENCY):
+        """GET / from concurrent keep-alive clients for duration seconds, return (ok, failed)"""
+        request = f"GET / HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode()
+        deadline = time.monotonic() + duration
+        ok = failed = 0
+        
+        async def client():
+            nonlocal ok, failed
+            writer = None
+            while time.monotonic() < deadline:
+                reused = writer is not None
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 5)
+                    status, keep_alive = await asyncio.wait_for(self._fetch(reader, writer, request), 5)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    failed += 1
+                    keep_alive = False
+                else:
+                    if status is None:
+                        # A server may drop an idle keep-alive connection, only a fresh one counts
+                        if not reused:
+                            failed += 1
+                    elif status < 500:
+                        ok += 1
+                    else:
+                        failed += 1
+                if not keep_alive and writer is not None:
+                    writer.close()
+                    writer = None
+            if writer is not None:
+                writer.close()
+        
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return ok, failed
+    
     def test_stress(self):
-        """Run stress tests with siege"""
+        """Run stress tests with an in-process load generator"""
         self.print_section("STRESS TESTS")
         
-        # Check if siege is installed
-        result = subprocess.run("which siege", shell=True, capture_output=True)
-        if result.returncode != 0:
-            print(f"{YELLOW}  Siege not installed. Install with: brew install siege (macOS) or apt-get install siege (Linux){RESET}")
-            print(f"{YELLOW}  Skipping stress tests{RESET}")
-            return None
-        
-        # Start server
-        self.server_process = subprocess.Popen([self.binary_path, self.config_path],
-                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
         tests_passed = []
         
         # Get initial memory usage
         process = psutil.Process(self.server_process.pid)
         initial_memory = process.memory_info().rss / 1024 / 1024  # MB
         
-        # Test 1: Basic siege test
-        print(f"{YELLOW}  Running siege test (10 seconds)...{RESET}")
-        result = subprocess.run("siege -b -t10s http://127.0.0.1:8888/ 2>&1 | grep 'Availability'",
-                              shell=True, capture_output=True, text=True)
+        # Test 1: Availability under load
+        print(f"{YELLOW}  Running stress test (10 seconds, {STRESS_CONCURRENCY} clients)...{RESET}")
+        ok, failed = asyncio.run(self._flood(self.host, self.port, 10))
         
-        if "Availability" in result.stdout:
-            # Extract availability percentage
-            availability = float(result.stdout.split(':')[1].strip().replace('%', ''))
+        if ok + failed > 0:
+            availability = ok / (ok + failed) * 100
             test_passed = availability >= 99.5
-            self.print_test(f"Availability test", test_passed, f"{availability:.2f}% (need >= 99.5%)")
+            self.print_test(f"Availability test", test_passed,
+                           f"{availability:.2f}% of {ok + failed} requests (need >= 99.5%)")
             tests_passed.append(test_passed)
         else:
             self.print_test("Availability test", False, "Could not measure availability")
@@ -636,18 +857,18 @@ server {
         tests_passed.append(test_passed)
         
         # Test 3: Check for hanging connections
-        result = subprocess.run("netstat -an | grep 8888 | grep ESTABLISHED | wc -l",
-                              shell=True, capture_output=True, text=True)
-        established = int(result.stdout.strip())
+        # Only the server's own sockets, net_connections() is connections() before psutil 6,
+        # and not our own idle keep-alive connections
+        self._close_idle(self.host, self.port)
+        list_connections = getattr(process, "net_connections", process.connections)
+        established = sum(1 for conn in list_connections(kind='tcp')
+                          if conn.status == psutil.CONN_ESTABLISHED and conn.laddr.port == self.port)
         
         test_passed = established < 10  # Should not have many hanging connections
         self.print_test("No hanging connections", test_passed,
                        f"{established} established connections")
         tests_passed.append(test_passed)
         
-        self.server_process.terminate()
-        self.server_process.wait()
-        
         return all(tests_passed)
 
 
@@ -656,133 +877,143 @@ server {
         """Test bonus features"""
         self.print_section("BONUS FEATURES")
         
-        # Start server
-        self.server_process = subprocess.Popen([self.binary_path, self.config_path],
-                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        time.sleep(2)
-        
         tests_passed = []
         
         # Test cookies and sessions
-        result = subprocess.run("curl -v http://127.0.0.1:8888/register 2>&1 | grep -i 'set-cookie'",
-                              shell=True, capture_output=True, text=True)
+        _, _, headers = self._get(f"{self.base_url}/register")
         
-        test_passed = "set-cookie" in result.stdout.lower()
+        test_passed = bool(headers.get_all("Set-Cookie"))
         self.print_test("Cookie system", test_passed)
         tests_passed.append(test_passed)
         
         # Test multiple CGI systems (Python and Shell)
-        has_python = os.path.exists("www/cgi-bin/lotr.py")
-        has_shell = os.path.exists("www/cgi-bin/star_wars.sh")
+        has_python = self.has_python_cgi
+        has_shell = self.has_shell_cgi
         
         test_passed = has_python and has_shell
         self.print_test("Multiple CGI systems", test_passed,
                        f"Python: {'✓' if has_python else '✗'}, Shell: {'✓' if has_shell else '✗'}")
         tests_passed.append(test_passed)
         
-        self.server_process.terminate()
-        self.server_process.wait()
-        
         return all(tests_passed)
     
 
 
     def run_correction_tests(self):
         """Run all correction sheet tests"""
-        print(f"\n{BLUE}{'='*60}{RESET}")
-        print(f"{BLUE}{'WEBSERV ADVANCED TESTS':^60}{RESET}")
-        print(f"{BLUE}{'='*60}{RESET}")
-        
-        # Check compilation
-        self.print_section("COMPILATION CHECK")
-        if not os.path.exists(self.binary_path):
-            self.print_test("Binary exists", False, f"Binary not found at {self.binary_path}")
-            print(f"\n{RED}Cannot continue without binary{RESET}")
-            return
-        else:
-            self.print_test("Binary exists", True)
-        
-        # Run Makefile to check for re-link issues
-        if os.path.exists("Makefile"):
-            result = subprocess.run("make", capture_output=True, text=True)
-            result2 = subprocess.run("make", capture_output=True, text=True)
+        try:
+            print(f"\n{BLUE}{'='*60}{RESET}")
+            print(f"{BLUE}{'WEBSERV ADVANCED TESTS':^60}{RESET}")
+            print(f"{BLUE}{'='*60}{RESET}")
             
-            test_passed = "Nothing to be done" in result2.stdout or "is up to date" in result2.stdout
-            self.print_test("No re-link issues", test_passed)
-        
-        # Test sections
-        test_sections = [
-            ("Memory Leaks", self.check_memory_leaks),
-            ("I/O Multiplexing", self.test_io_multiplexing),
-            ("Configuration", self.test_configuration),
-            ("Basic Checks", self.test_basic_checks),
-            ("CGI", self.test_cgi),
-            ("Browser Compatibility", self.test_browser_compatibility),
-            ("Port Issues", self.test_port_issues),
-            ("Stress Tests", self.test_stress),
-            ("Bonus Features", self.test_bonus)
-        ]
-        
-        results = {}
-        mandatory_fail = False
-        
-        for name, test_func in test_sections:
-            try:
-                result = test_func()
-                results[name] = result
-                
-                # Check for mandatory failures
-                if name in ["Memory Leaks", "I/O Multiplexing", "Configuration", "Basic Checks"] and result == False:
-                    mandatory_fail = True
-                    
-            except Exception as e:
-                print(f"{RED}Error in {name}: {e}{RESET}")
-                results[name] = False
-        
-        # Print summary
-        self.print_section("EVALUATION SUMMARY")
-        
-        print(f"\n{BLUE}{'Test Section':<30} {'Result':<15} {'Grade Impact'}{RESET}")
-        print(f"{'-'*60}")
-        
-        for name, result in results.items():
-            if result is None:
-                status = f"{YELLOW}SKIPPED{RESET}"
-                impact = "N/A"
-            elif result:
-                status = f"{GREEN}PASS{RESET}"
-                impact = "✓"
+            # Check compilation
+            self.print_section("COMPILATION CHECK")
+            if not os.path.exists(self.binary_path):
+                self.print_test("Binary exists", False, f"Binary not found at {self.binary_path}")
+                print(f"\n{RED}Cannot continue without binary{RESET}")
+                return
             else:
-                status = f"{RED}FAIL{RESET}"
-                if name in ["Memory Leaks", "I/O Multiplexing"]:
-                    impact = "GRADE = 0"
-                elif name in ["Configuration", "Basic Checks", "CGI"]:
-                    impact = "Major penalty"
-                elif name in ["Bonus Features"]:
-                    impact = "No bonus points"
-                else:
-                    impact = "Minor penalty"
+                self.print_test("Binary exists", True)
             
-            print(f"{name:<30} {status:<24} {impact}")
-        
-        # Final verdict
-        print(f"\n{BLUE}{'='*60}{RESET}")
-        if mandatory_fail:
-            print(f"{RED}{'MANDATORY PART FAILED - GRADE: 0':^60}{RESET}")
-            print(f"{RED}Fix critical issues before resubmission{RESET}")
-        else:
-            passed = sum(1 for r in results.values() if r == True)
-            total = sum(1 for r in results.values() if r is not None)
-            percentage = (passed / total * 100) if total > 0 else 0
+            # Run Makefile to check for re-link issues
+            if self.has_makefile:
+                # make -q builds nothing and exits 0 only when everything is up to date
+                result = subprocess.run(["make", "-q"], capture_output=True)
+                if result.returncode != 0:
+                    # Build once, after that there must be nothing left to do
+                    subprocess.run(["make"], capture_output=True)
+                    result = subprocess.run(["make", "-q"], capture_output=True)
+                
+                test_passed = result.returncode == 0
+                self.print_test("No re-link issues", test_passed)
             
-            if percentage >= 90:
-                print(f"{GREEN}{'EXCELLENT - Ready for evaluation':^60}{RESET}")
-            elif percentage >= 70:
-                print(f"{YELLOW}{'GOOD - Minor issues to fix':^60}{RESET}")
-            else:
-                print(f"{RED}{'NEEDS WORK - Multiple issues found':^60}{RESET}")
+            # Test sections
+            test_sections = [
+                ("Memory Leaks", self.check_memory_leaks),
+                ("I/O Multiplexing", self.test_io_multiplexing),
+                ("Configuration", self.test_configuration),
+                ("Basic Checks", self.test_basic_checks),
+                ("CGI", self.test_cgi),
+                ("Browser Compatibility", self.test_browser_compatibility),
+                ("Port Issues", self.test_port_issues),
+                ("Stress Tests", self.test_stress),
+                ("Bonus Features", self.test_bonus)
+            ]
+            
+            results = {}
+            mandatory_fail = False
+            
+            # One server with the main config is shared by every section,
+            # sections that need another config start their own next to it
+            try:
+                with self._server() as server:
+                    self.server_process = server
+                    for name, test_func in test_sections:
+                        try:
+                            result = test_func()
+                            results[name] = result
+                            
+                            # Check for mandatory failures
+                            if name in ["Memory Leaks", "I/O Multiplexing", "Configuration", "Basic Checks"] and result == False:
+                                mandatory_fail = True
+                                
+                        except Exception as e:
+                            print(f"{RED}Error in {name}: {e}{RESET}")
+                            results[name] = False
+            except RuntimeError as e:
+                # Only _server raises it here, the sections' own errors are caught above
+                self.print_test("Server starts", False, str(e))
+                print(f"\n{RED}Cannot continue without a running server{RESET}")
+                return
+            finally:
+                self.server_process = None
+            
+            # Print summary
+            self.print_section("EVALUATION SUMMARY")
             
-            print(f"\n{BLUE}Score: {passed}/{total} tests passed ({percentage:.1f}%){RESET}")
+            print(f"\n{BLUE}{'Test Section':<30} {'Result':<15} {'Grade Impact'}{RESET}")
+            print(f"{'-'*60}")
+            
+            for name, result in results.items():
+                if result is None:
+                    status = f"{YELLOW}SKIPPED{RESET}"
+                    impact = "N/A"
+                elif result:
+                    status = f"{GREEN}PASS{RESET}"
+                    impact = "✓"
+                else:
+                    status = f"{RED}FAIL{RESET}"
+                    if name in ["Memory Leaks", "I/O Multiplexing"]:
+                        impact = "GRADE = 0"
+                    elif name in ["Configuration", "Basic Checks", "CGI"]:
+                        impact = "Major penalty"
+                    elif name in ["Bonus Features"]:
+                        impact = "No bonus points"
+                    else:
+                        impact = "Minor penalty"
+                
+                print(f"{name:<30} {status:<24} {impact}")
+            
+            # Final verdict
+            print(f"\n{BLUE}{'='*60}{RESET}")
+            if mandatory_fail:
+                print(f"{RED}{'MANDATORY PART FAILED - GRADE: 0':^60}{RESET}")
+                print(f"{RED}Fix critical issues before resubmission{RESET}")
+            else:
+                passed = sum(1 for r in results.values() if r == True)
+                total = sum(1 for r in results.values() if r is not None)
+                percentage = (passed / total * 100) if total > 0 else 0
+                
+                if percentage >= 90:
+                    print(f"{GREEN}{'EXCELLENT - Ready for evaluation':^60}{RESET}")
+                elif percentage >= 70:
+                    print(f"{YELLOW}{'GOOD - Minor issues to fix':^60}{RESET}")
+                else:
+                    print(f"{RED}{'NEEDS WORK - Multiple issues found':^60}{RESET}")
+                
+                print(f"\n{BLUE}Score: {passed}/{total} tests passed ({percentage:.1f}%){RESET}")
+        finally:
+            self._close()
 
 
 
@@ -809,10 +1040,8 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print(f"\n{YELLOW}Tests interrupted by user{RESET}")
         if tester.server_process:
-            tester.server_process.terminate()
-            tester.server_process.wait()
+            tester._stop(tester.server_process)
     except Exception as e:
         print(f"\n{RED}Unexpected error: {e}{RESET}")
         if tester.server_process:
-            tester.server_process.terminate()
-            tester.server_process.wait()
+            tester._stop(tester.server_process)
@@ -4,13 +4,20 @@ General Tests for 42 Webserv Project
 Tests error codes, permissions, file uploads, configuration errors, etc.
 """
 
+import atexit
 import subprocess
+import socket
 import time
 import os
+import select
+import signal
 import sys
 import tempfile
 import random
 import string
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Colors for output
@@ -20,164 +27,79 @@ YELLOW = '\033[93m'
 BLUE = '\033[94m'
 RESET = '\033[0m'
 
-class WebservGeneralTester:
-    def __init__(self, binary_path="./webserv", config_path="config/example.conf"):
-        self.binary_path = binary_path
-        self.config_path = config_path
-        self.server_process = None
-        self.test_results = []
-        
-    def print_test_header(self, test_name):
-        print(f"\n{BLUE}{'='*50}{RESET}")
-        print(f"{BLUE}Testing: {test_name}{RESET}")
-        print(f"{BLUE}{'='*50}{RESET}")
-    
-    def run_curl(self, command, expected_code=None):
-        """Run a curl command and check the response code"""
-        try:
-            result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=5)
-            
-            # Extract HTTP status code from curl output
-            curl_status_cmd = command + " -o /dev/null -w '%{http_code}'"
-            status_result = subprocess.run(curl_status_cmd, shell=True, capture_output=True, text=True, timeout=5)
-            status_code = status_result.stdout.strip().replace("'", "")
-            
-            if expected_code and str(expected_code) == status_code:
-                print(f"{GREEN}✓ {command} returned {status_code} as expected{RESET}")
-                return True
-            elif expected_code:
-                print(f"{RED}✗ {command} returned {status_code}, expected {expected_code}{RESET}")
-                return False
-            else:
-                print(f"{YELLOW}→ {command} returned {status_code}{RESET}")
-                return True
-        except subprocess.TimeoutExpired:
-            print(f"{RED}✗ Curl command timed out{RESET}")
-            return False
-        except Exception as e:
-            print(f"{RED}✗ Error running curl: {e}{RESET}")
-            return False
-    
-    def test_error_codes(self):
-        """Test 1: Trigger various error codes with curl commands"""
-        self.print_test_header("Error Codes with CURL")
-        
-        tests = [
-            # 400 Bad Request
-            ("curl -X INVALID http://127.0.0.1:8888/", 400),
-            ("curl -H 'Host:' http://127.0.0.1:8888/", 400),
-            ("curl --request-target '*' http://127.0.0.1:8888/", 400),
-            
-            # 403 Forbidden 
-            ("curl -X POST http://127.0.0.1:8888/", 403),
-            ("curl -X DELETE http://127.0.0.1:8888/index.html", 403),
-            
-            # 404 Not Found
-            ("curl http://127.0.0.1:8888/nonexistent", 404),
-            ("curl http://127.0.0.1:8888/no_such_file.html", 404),
-            ("curl http://127.0.0.1:8888/uploads/", 404),  # autoindex off by default
-            
-            # 405 Method Not Allowed
-            ("curl -X PUT http://127.0.0.1:8888/", 405),
-            ("curl -X PATCH http://127.0.0.1:8888/", 405),
-            ("curl -X OPTIONS http://127.0.0.1:8888/", 405),
-            
-            # 413 Payload Too Large (assuming client_max_body_size is 50000)
-            ("curl -X POST -H 'Content-Type: text/plain' --data '" + ("x" * 60000) + "' http://127.0.0.1:8888/methods", 413),
-        ]
-        
-        passed = 0
-        for cmd, expected in tests:
-            if self.run_curl(cmd, expected):
-                passed += 1
-        
-        print(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} error code tests{RESET}")
-        return passed == len(tests)
-    
-    def test_file_uploads(self):
-        """Test 2: POST files of different sizes"""
-        self.print_test_header("File Uploads - Different Sizes")
-        
-        # Create temporary files of different sizes
-        sizes = [100, 1000, 10000, 49999, 50001]  # Last one should fail if limit is 50000
-        test_files = []
-        
-        for size in sizes:
-            fd, path = tempfile.mkstemp(suffix='.txt')
-            with os.fdopen(fd, 'w') as f:
-                f.write('X' * size)
-            test_files.append((path, size))
-        
-        passed = 0
-        for filepath, size in test_files:
-            expected = 201 if size <= 50000 else 413
-            cmd = f"curl -X POST -H 'Content-Type: text/plain' --data-binary '@{filepath}' http://127.0.0.1:8888/methods"
-            
-            if self.run_curl(cmd, expected):
-                passed += 1
-            
-            # Clean up
-            os.unlink(filepath)
-        
-        print(f"\n{GREEN if passed == len(test_files) else YELLOW}Passed {passed}/{len(test_files)} file upload tests{RESET}")
-        return passed == len(test_files)
-    
-    def test_permission_errors(self):
-        """Test 3: POST to URLs without permissions"""
-        self.print_test_header("Permission Tests")
-        
-        tests = [
-            # Locations that don't allow POST
-            ("curl -X POST --data 'test' http://127.0.0.1:8888/", 403),
-            ("curl -X POST --data 'test' http://127.0.0.1:8888/index.html", 403),
-            ("curl -X POST --data 'test' http://127.0.0.1:8888/dashboard", 403),
-            ("curl -X POST --data 'test' http://127.0.0.1:8888/autoindex", 403),
-            
-            # Locations that don't allow DELETE
-            ("curl -X DELETE http://127.0.0.1:8888/", 403),
-            ("curl -X DELETE http://127.0.0.1:8888/dashboard.html", 403),
-            
-            # Locations that allow certain methods
-            ("curl -X GET http://127.0.0.1:8888/methods", 200),
-            ("curl -X POST --data 'test' http://127.0.0.1:8888/methods", 201),
-            ("curl -X DELETE http://127.0.0.1:8888/uploads/file.txt", 200),  # if file exists
-        ]
-        
-        passed = 0
-        for cmd, expected in tests:
-            if self.run_curl(cmd, expected):
-                passed += 1
-        
-        print(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} permission tests{RESET}")
-        return passed == len(tests)
-    
-    def test_autoindex(self):
-        """Test 4: Autoindex functionality"""
-        self.print_test_header("Autoindex Tests")
-        
-        tests = [
-            # Directories without trailing slash and autoindex off should give 404
-            ("curl http://127.0.0.1:8888/uploads", 404),
-            
-            # Directories with autoindex on (based on config)
-            ("curl http://127.0.0.1:8888/uploads/", 200),  # autoindex on
-            ("curl http://127.0.0.1:8888/uploads/01/", 200),  # autoindex on
-            
-            # Directories with autoindex off
-            ("curl http://127.0.0.1:8888/cgi-bin/", 200),  # has autoindex on in config
-        ]
-        
-        passed = 0
-        for cmd, expected in tests:
-            if self.run_curl(cmd, expected):
-                passed += 1
-        
-        print(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} autoindex tests{RESET}")
-        return passed == len(tests)
-    
-    def create_config_with_duplicate_ports(self):
-        """Create a config file with duplicate ports"""
-        config = """
+# Request cases as (method, path, headers, body, expected status), built once at import
+BIG_PAYLOAD = b"x" * 60000
+
+ERROR_CODE_TESTS = (
+    # 400 Bad Request
+    ("INVALID", "/", None, None, 400),
+    ("GET", "/", {"Host": None}, None, 400),
+    ("GET", "*", None, None, 400),
+
+    # 403 Forbidden 
+    ("POST", "/", None, None, 403),
+    ("DELETE", "/index.html", None, None, 403),
+
+    # 404 Not Found
+    ("GET", "/nonexistent", None, None, 404),
+    ("GET", "/no_such_file.html", None, None, 404),
+    ("GET", "/uploads/", None, None, 404),  # autoindex off by default
+
+    # 405 Method Not Allowed
+    ("PUT", "/", None, None, 405),
+    ("PATCH", "/", None, None, 405),
+    ("OPTIONS", "/", None, None, 405),
+
+    # 413 Payload Too Large (assuming client_max_body_size is 50000)
+    ("POST", "/methods", {"Content-Type": "text/plain"}, BIG_PAYLOAD, 413),
+)
+
+PERMISSION_TESTS = (
+    # Locations that don't allow POST
+    ("POST", "/", None, "test", 403),
+    ("POST", "/index.html", None, "test", 403),
+    ("POST", "/dashboard", None, "test", 403),
+    ("POST", "/autoindex", None, "test", 403),
+
+    # Locations that don't allow DELETE
+    ("DELETE", "/", None, None, 403),
+    ("DELETE", "/dashboard.html", None, None, 403),
+
+    # Locations that allow certain methods
+    ("GET", "/methods", None, None, 200),
+)
+
+# Sent one after the other, the DELETE expects the file the POST leaves behind
+PERMISSION_ORDERED_TESTS = (
+    ("POST", "/methods", None, "test", 201),
+    ("DELETE", "/uploads/file.txt", None, None, 200),  # if file exists
+)
+
+AUTOINDEX_TESTS = (
+    # Directories without trailing slash and autoindex off should give 404
+    ("GET", "/uploads", None, None, 404),
+
+    # Directories with autoindex on (based on config)
+    ("GET", "/uploads/", None, None, 200),  # autoindex on
+    ("GET", "/uploads/01/", None, None, 200),  # autoindex on
+
+    # Directories with autoindex off
+    ("GET", "/cgi-bin/", None, None, 200),  # has autoindex on in config
+)
+
+CGI_TESTS = (
+    # GET requests to CGI
+    ("GET", "/cgi-bin/lotr", None, None, 200),
+    ("GET", "/cgi-bin/lotr?action=time", None, None, 200),
+    ("GET", "/cgi-bin/star-wars", None, None, 200),
+
+    # POST requests to CGI
+    ("POST", "/cgi-bin/lotr", None, "username=test&message=hello", 200),
+    ("POST", "/cgi-bin/star-wars", None, "username=test&message=hello", 200),
+)
+
+# Invalid configs the server must refuse to start with
+DUPLICATE_PORTS_CONFIG = """
 server {
     host 127.0.0.1;
     listen 8080;
@@ -202,14 +124,8 @@ server {
     }
 }
 """
-        fd, path = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd, 'w') as f:
-            f.write(config)
-        return path
-    
-    def create_config_with_duplicate_names(self):
-        """Create a config file with duplicate server names"""
-        config = """
+
+DUPLICATE_NAMES_CONFIG = """
 server {
     host 127.0.0.1;
     listen 8080;
@@ -234,14 +150,8 @@ server {
     }
 }
 """
-        fd, path = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd, 'w') as f:
-            f.write(config)
-        return path
-    
-    def create_config_with_duplicate_locations(self):
-        """Create a config file with duplicate locations"""
-        config = """
+
+DUPLICATE_LOCATIONS_CONFIG = """
 server {
     host 127.0.0.1;
     listen 8080;
@@ -259,90 +169,358 @@ server {
     }
 }
 """
-        fd, path = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd, 'w') as f:
+
+# Config for the second server started next to the main one
+SECOND_SERVER_CONFIG = """
+server {
+    host 127.0.0.1;
+    listen 9999;
+    server_name second_server;
+    root ./www/;
+    
+    location / {
+        index index.html;
+        allowed_methods GET;
+    }
+}
+"""
+
+# Most idle keep-alive connections kept per port, like curl's MAXCONNECTS
+MAX_IDLE_CONNECTIONS = 32
+
+# Uploads are streamed from this one chunk instead of being built whole
+UPLOAD_CHUNK = b"X" * 8192
+
+class UploadBody:
+    """Request body of a given size, sent in fixed chunks without ever being held whole"""
+    def __init__(self, size):
+        self.size = size
+    
+    def __len__(self):
+        return self.size
+    
+    def __iter__(self):
+        # A fresh pass on every iteration, so a retried request sends the body again
+        chunk = memoryview(UPLOAD_CHUNK)
+        for offset in range(0, self.size, len(chunk)):
+            yield chunk[:self.size - offset]
+
+class WebservGeneralTester:
+    def __init__(self, binary_path="./webserv", config_path="config/example.conf"):
+        self.binary_path = binary_path
+        self.config_path = config_path
+        self.server_process = None
+        # The cases of a test are sent concurrently through this pool
+        self.pool = ThreadPoolExecutor(max_workers=16)
+        # Idle keep-alive connections per port, shared by every case and test
+        self._idle = {}
+        self._idle_lock = threading.Lock()
+        # Output lines are buffered per thread and written out in one go
+        self.output = threading.local()
+        # Each thread drains response bodies into its own scratch buffer, allocated once
+        self.scratch = threading.local()
+        # Upload bodies by size, streamed in UPLOAD_CHUNK pieces
+        sizes = [100, 1000, 10000, 49999, 50001]  # Last one should fail if limit is 50000
+        self.upload_bodies = {size: UploadBody(size) for size in sizes}
+        # Scratch config files live here, removed in one go when the tester exits
+        self.tmpdir = tempfile.TemporaryDirectory(prefix='webserv_tester_')
+        atexit.register(self.tmpdir.cleanup)
+        # The configs never change, so they are written once under fixed names
+        self.error_configs = [
+            (self.write_config("duplicate_ports.conf", DUPLICATE_PORTS_CONFIG), "duplicate ports"),
+            (self.write_config("duplicate_names.conf", DUPLICATE_NAMES_CONFIG), "duplicate server names"),
+            (self.write_config("duplicate_locations.conf", DUPLICATE_LOCATIONS_CONFIG), "duplicate locations"),
+        ]
+        self.second_server_config = self.write_config("second_server.conf", SECOND_SERVER_CONFIG)
+        
+    def write_config(self, name, config):
+        """Write a config file into the scratch directory and return its path"""
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
             f.write(config)
         return path
     
+    def log(self, message):
+        """Buffer a line of output for the current thread"""
+        self.output.__dict__.setdefault("lines", []).append(f"{message}\n")
+    
+    def take_log(self):
+        """Return and clear the output buffered by the current thread"""
+        return "".join(self.output.__dict__.pop("lines", []))
+    
+    def flush_log(self):
+        """Write the current thread's buffered output with a single write"""
+        sys.stdout.write(self.take_log())
+        sys.stdout.flush()
+    
+    def run_logged(self, test):
+        """Run a test in a worker thread, return its result with the output it produced"""
+        result = test()
+        return result, self.take_log()
+    
+    def run_group(self, group):
+        """Run (name, test) pairs one after the other, return (name, result, output) for each"""
+        return [(name, *self.run_logged(test)) for name, test in group]
+    
+    def print_test_header(self, test_name):
+        self.log(f"\n{BLUE}{'='*50}{RESET}")
+        self.log(f"{BLUE}Testing: {test_name}{RESET}")
+        self.log(f"{BLUE}{'='*50}{RESET}")
+    
+    def describe(self, method, path, headers=None, body=None, port=8888):
+        """Short label for a request, used in the report lines"""
+        # Origin-form paths follow the port directly, others such as * are set apart
+        label = f"{method} :{port}{path}" if path.startswith("/") else f"{method} :{port} {path}"
+        for name, value in (headers or {}).items():
+            label += f" [{name}: {value or ''}]"
+        if body is not None:
+            label += f" ({len(body)} bytes)"
+        return label
+    
+    def checkout(self, port):
+        """Take an idle connection to the port from the pool, or open a new one"""
+        with self._idle_lock:
+            idle = self._idle.get(port)
+            if idle:
+                return idle.pop(), True
+        return http.client.HTTPConnection("127.0.0.1", port, timeout=5), False
+    
+    def checkin(self, port, conn):
+        """Keep a connection open for the next request to the same port, up to MAX_IDLE_CONNECTIONS"""
+        with self._idle_lock:
+            idle = self._idle.setdefault(port, [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(conn)
+                return
+        conn.close()
+    
+    def close_connections(self):
+        """Close every idle connection, they die with the server anyway"""
+        with self._idle_lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+    
+    def send_request(self, method, path, headers=None, body=None, port=8888):
+        """Send one request in-process and return the response, its body already drained"""
+        headers = dict(headers or {})
+        if isinstance(body, str):
+            body = body.encode()
+        if body is not None:
+            # Same default curl uses for --data
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+            headers["Content-Length"] = str(len(body))
+        
+        conn, reused = self.checkout(port)
+        try:
+            # A None header value leaves it out, e.g. a request without Host
+            conn.putrequest(method, path, skip_host="Host" in headers, skip_accept_encoding=True)
+            for name, value in headers.items():
+                if value is not None:
+                    conn.putheader(name, value)
+            conn.endheaders(body)
+            response = conn.getresponse()
+            # Only the status and headers are checked, drain the body without keeping it
+            buffer = getattr(self.scratch, "buffer", None)
+            if buffer is None:
+                buffer = self.scratch.buffer = bytearray(16384)
+            while response.readinto(buffer):
+                pass
+        except TimeoutError:
+            conn.close()
+            raise
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            # The server may have dropped an idle connection, retry once on a fresh one
+            if reused:
+                return self.send_request(method, path, headers, body, port)
+            raise
+        
+        if response.will_close:
+            conn.close()
+        else:
+            self.checkin(port, conn)
+        return response
+    
+    def run_request(self, method, path, headers=None, body=None, expected_code=None, port=8888):
+        """Send a request and check the response code, return (passed, report line)"""
+        label = self.describe(method, path, headers, body, port)
+        try:
+            status_code = self.send_request(method, path, headers, body, port).status
+        except TimeoutError:
+            return False, f"{RED}✗ {label} timed out{RESET}"
+        except Exception as e:
+            return False, f"{RED}✗ Error sending {label}: {e}{RESET}"
+        
+        if expected_code and expected_code == status_code:
+            return True, f"{GREEN}✓ {label} returned {status_code} as expected{RESET}"
+        elif expected_code:
+            return False, f"{RED}✗ {label} returned {status_code}, expected {expected_code}{RESET}"
+        else:
+            return True, f"{YELLOW}→ {label} returned {status_code}{RESET}"
+    
+    def wait_for_port(self, port, process=None, timeout=5.0):
+        """Poll until the port accepts connections, False on timeout or if the process exits"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                return False
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                return True
+            except OSError:
+                time.sleep(0.02)
+        return False
+    
+    def wait_process(self, process, timeout):
+        """Block until the process exits, return its exit code or None on timeout"""
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            # No pidfd on this kernel or Python, fall back to subprocess's own wait
+            try:
+                return process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                return None
+        try:
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            if not poller.poll(timeout * 1000):
+                return None
+        finally:
+            os.close(pidfd)
+        return process.wait()
+    
+    def kill_group(self, process):
+        """Stop a process started in its own session along with anything it spawned"""
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        if process.returncode is None and self.wait_process(process, timeout=2) is None:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+    
+    def run_cases(self, cases, ordered=False):
+        """Send (method, path, headers, body, expected) cases concurrently, or in order if ordered, return how many passed"""
+        if ordered:
+            results = [self.run_request(*case) for case in cases]
+        else:
+            results = list(self.pool.map(lambda case: self.run_request(*case), cases))
+        for _, line in results:
+            self.log(line)
+        return sum(1 for passed, _ in results if passed)
+    
+    def test_error_codes(self):
+        """Test 1: Trigger various error codes"""
+        self.print_test_header("Error Codes")
+        
+        tests = ERROR_CODE_TESTS
+        
+        passed = self.run_cases(tests)
+        
+        self.log(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} error code tests{RESET}")
+        return passed == len(tests)
+    
+    def test_file_uploads(self):
+        """Test 2: POST files of different sizes"""
+        self.print_test_header("File Uploads - Different Sizes")
+        
+        cases = []
+        for size, body in self.upload_bodies.items():
+            expected = 201 if size <= 50000 else 413
+            cases.append(("POST", "/methods", {"Content-Type": "text/plain"}, body, expected))
+        
+        passed = self.run_cases(cases)
+        
+        self.log(f"\n{GREEN if passed == len(cases) else YELLOW}Passed {passed}/{len(cases)} file upload tests{RESET}")
+        return passed == len(cases)
+    
+    def test_permission_errors(self):
+        """Test 3: POST to URLs without permissions"""
+        self.print_test_header("Permission Tests")
+        
+        tests = PERMISSION_TESTS + PERMISSION_ORDERED_TESTS
+        
+        passed = self.run_cases(PERMISSION_TESTS)
+        passed += self.run_cases(PERMISSION_ORDERED_TESTS, ordered=True)
+        
+        self.log(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} permission tests{RESET}")
+        return passed == len(tests)
+    
+    def test_autoindex(self):
+        """Test 4: Autoindex functionality"""
+        self.print_test_header("Autoindex Tests")
+        
+        tests = AUTOINDEX_TESTS
+        
+        passed = self.run_cases(tests)
+        
+        self.log(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} autoindex tests{RESET}")
+        return passed == len(tests)
+    
     def test_config_errors(self):
         """Test 5: Configuration error handling"""
         self.print_test_header("Configuration Error Handling")
         
-        test_configs = [
-            (self.create_config_with_duplicate_ports(), "duplicate ports"),
-            (self.create_config_with_duplicate_names(), "duplicate server names"),
-            (self.create_config_with_duplicate_locations(), "duplicate locations"),
-        ]
+        test_configs = self.error_configs
         
         passed = 0
         for config_path, description in test_configs:
-            print(f"\nTesting {description}...")
+            self.log(f"\nTesting {description}...")
             try:
                 # Try to start server with bad config
-                result = subprocess.run(
+                process = subprocess.Popen(
                     [self.binary_path, config_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
                 )
+                returncode = self.wait_process(process, timeout=2)
                 
                 # Server should exit with error
-                if result.returncode != 0:
-                    print(f"{GREEN}✓ Server correctly rejected config with {description}{RESET}")
+                if returncode is None:
+                    self.log(f"{RED}✗ Server hung with {description}{RESET}")
+                    self.kill_group(process)
+                elif returncode != 0:
+                    self.log(f"{GREEN}✓ Server correctly rejected config with {description}{RESET}")
                     passed += 1
                 else:
-                    print(f"{RED}✗ Server accepted invalid config with {description}{RESET}")
-                    # Kill the server if it started
-                    subprocess.run(["pkill", "-f", self.binary_path], capture_output=True)
-            except subprocess.TimeoutExpired:
-                print(f"{RED}✗ Server hung with {description}{RESET}")
-                subprocess.run(["pkill", "-f", self.binary_path], capture_output=True)
+                    self.log(f"{RED}✗ Server accepted invalid config with {description}{RESET}")
+                    # Kill anything the server left running
+                    self.kill_group(process)
+            except FileNotFoundError:
+                # A missing binary is fatal, not a config failure
+                raise
             except Exception as e:
-                print(f"{RED}✗ Error testing {description}: {e}{RESET}")
-            finally:
-                os.unlink(config_path)
+                self.log(f"{RED}✗ Error testing {description}: {e}{RESET}")
         
-        print(f"\n{GREEN if passed == len(test_configs) else YELLOW}Passed {passed}/{len(test_configs)} config error tests{RESET}")
+        self.log(f"\n{GREEN if passed == len(test_configs) else YELLOW}Passed {passed}/{len(test_configs)} config error tests{RESET}")
         return passed == len(test_configs)
     
     def test_multiple_servers(self):
         """Test 6: Multiple servers running simultaneously"""
         self.print_test_header("Multiple Servers Test")
         
-        # Create config for second server
-        config2 = """
-server {
-    host 127.0.0.1;
-    listen 9999;
-    server_name second_server;
-    root ./www/;
-    
-    location / {
-        index index.html;
-        allowed_methods GET;
-    }
-}
-"""
-        fd, path2 = tempfile.mkstemp(suffix='.conf')
-        with os.fdopen(fd, 'w') as f:
-            f.write(config2)
-        
         try:
             # Start second server
-            server2 = subprocess.Popen([self.binary_path, path2], 
+            server2 = subprocess.Popen([self.binary_path, self.second_server_config], 
                                       stdout=subprocess.PIPE, 
                                       stderr=subprocess.PIPE)
-            time.sleep(2)
+            self.wait_for_port(9999, server2)
             
             # Test both servers
-            result1 = self.run_curl("curl http://127.0.0.1:8888/", 200)
-            result2 = self.run_curl("curl http://127.0.0.1:9999/", 200)
+            result1, line1 = self.run_request("GET", "/", expected_code=200)
+            result2, line2 = self.run_request("GET", "/", expected_code=200, port=9999)
+            self.log(line1)
+            self.log(line2)
             
             if result1 and result2:
-                print(f"{GREEN}✓ Both servers responding correctly{RESET}")
+                self.log(f"{GREEN}✓ Both servers responding correctly{RESET}")
                 passed = True
             else:
-                print(f"{RED}✗ One or both servers not responding{RESET}")
+                self.log(f"{RED}✗ One or both servers not responding{RESET}")
                 passed = False
             
             # Clean up
@@ -350,10 +528,8 @@ server {
             server2.wait(timeout=5)
             
         except Exception as e:
-            print(f"{RED}✗ Error testing multiple servers: {e}{RESET}")
+            self.log(f"{RED}✗ Error testing multiple servers: {e}{RESET}")
             passed = False
-        finally:
-            os.unlink(path2)
         
         return passed
     
@@ -361,23 +537,11 @@ server {
         """Test 7: CGI functionality"""
         self.print_test_header("CGI Tests")
         
-        tests = [
-            # GET requests to CGI
-            ("curl http://127.0.0.1:8888/cgi-bin/lotr", 200),
-            ("curl http://127.0.0.1:8888/cgi-bin/lotr?action=time", 200),
-            ("curl http://127.0.0.1:8888/cgi-bin/star-wars", 200),
-            
-            # POST requests to CGI
-            ("curl -X POST -d 'username=test&message=hello' http://127.0.0.1:8888/cgi-bin/lotr", 200),
-            ("curl -X POST -d 'username=test&message=hello' http://127.0.0.1:8888/cgi-bin/star-wars", 200),
-        ]
+        tests = CGI_TESTS
         
-        passed = 0
-        for cmd, expected in tests:
-            if self.run_curl(cmd, expected):
-                passed += 1
+        passed = self.run_cases(tests)
         
-        print(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} CGI tests{RESET}")
+        self.log(f"\n{GREEN if passed == len(tests) else YELLOW}Passed {passed}/{len(tests)} CGI tests{RESET}")
         return passed == len(tests)
     
     def test_cookies(self):
@@ -385,118 +549,127 @@ server {
         self.print_test_header("Cookie/Session Tests")
         
         # Test register endpoint sets cookie
-        result = subprocess.run(
-            "curl -v http://127.0.0.1:8888/register 2>&1 | grep -i 'set-cookie'",
-            shell=True,
-            capture_output=True,
-            text=True
-        )
+        try:
+            response = self.send_request("GET", "/register")
+        except Exception as e:
+            self.log(f"{RED}✗ Error requesting /register: {e}{RESET}")
+            return False
         
-        if "set-cookie" in result.stdout.lower():
-            print(f"{GREEN}✓ Server sets cookies on /register{RESET}")
+        if response.getheader("Set-Cookie"):
+            self.log(f"{GREEN}✓ Server sets cookies on /register{RESET}")
             passed = True
         else:
-            print(f"{RED}✗ Server doesn't set cookies on /register{RESET}")
+            self.log(f"{RED}✗ Server doesn't set cookies on /register{RESET}")
             passed = False
         
         return passed
     
     def start_server(self):
         """Start the webserv server"""
-        print(f"{YELLOW}Starting webserv with config: {self.config_path}{RESET}")
+        self.log(f"{YELLOW}Starting webserv with config: {self.config_path}{RESET}")
         self.server_process = subprocess.Popen(
             [self.binary_path, self.config_path],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
-        time.sleep(3)  # Give server time to start
         
-        # Check if server is running
-        if self.server_process.poll() is not None:
-            print(f"{RED}✗ Server failed to start{RESET}")
+        # Check if server is running and accepting connections
+        if not self.wait_for_port(8888, self.server_process):
+            self.log(f"{RED}✗ Server failed to start{RESET}")
+            # It may still be running, just not on 8888 yet, don't leave it behind
+            self.stop_server()
             return False
         
-        print(f"{GREEN}✓ Server started successfully{RESET}")
+        self.log(f"{GREEN}✓ Server started successfully{RESET}")
         return True
     
     def stop_server(self):
         """Stop the webserv server"""
+        self.close_connections()
         if self.server_process:
-            print(f"{YELLOW}Stopping server...{RESET}")
+            self.log(f"{YELLOW}Stopping server...{RESET}")
             self.server_process.terminate()
             try:
                 self.server_process.wait(timeout=5)
-                print(f"{GREEN}✓ Server stopped{RESET}")
+                self.log(f"{GREEN}✓ Server stopped{RESET}")
             except subprocess.TimeoutExpired:
                 self.server_process.kill()
-                print(f"{YELLOW}Server killed{RESET}")
+                self.log(f"{YELLOW}Server killed{RESET}")
             self.server_process = None
     
     def run_all_tests(self):
         """Run all general tests"""
-        print(f"\n{BLUE}{'='*60}{RESET}")
-        print(f"{BLUE}{'WEBSERV GENERAL TESTS':^60}{RESET}")
-        print(f"{BLUE}{'='*60}{RESET}")
+        self.log(f"\n{BLUE}{'='*60}{RESET}")
+        self.log(f"{BLUE}{'WEBSERV GENERAL TESTS':^60}{RESET}")
+        self.log(f"{BLUE}{'='*60}{RESET}")
+        
+        # Run config error tests first, they use their own configs and ports so the main
+        # server doesn't have to be stopped and restarted around them
+        config_result = ("Config Errors", self.test_config_errors())
+        self.flush_log()
         
-        # Start server for regular tests
+        # Start server once for all remaining tests
         if not self.start_server():
-            print(f"{RED}Failed to start server, aborting tests{RESET}")
+            self.log(f"{RED}Failed to start server, aborting tests{RESET}")
+            self.flush_log()
             return
-        
-        test_results = []
-        
-        # Run tests that require server to be running
-        test_results.append(("Error Codes", self.test_error_codes()))
-        test_results.append(("File Uploads", self.test_file_uploads()))
-        test_results.append(("Permissions", self.test_permission_errors()))
-        test_results.append(("Autoindex", self.test_autoindex()))
-        test_results.append(("CGI", self.test_cgi()))
-        test_results.append(("Cookies", self.test_cookies()))
-        
-        # Stop server for config tests
+        self.flush_log()
+        
+        # Run tests that require server to be running, the groups share no state so run them side by side
+        # and each test's output is written out whole, in this order. File Uploads and Permissions both
+        # change what's under /methods and /uploads, so they run one after the other
+        groups = [
+            [("Error Codes", self.test_error_codes)],
+            [("File Uploads", self.test_file_uploads), ("Permissions", self.test_permission_errors)],
+            [("Autoindex", self.test_autoindex)],
+            [("CGI", self.test_cgi)],
+            [("Cookies", self.test_cookies)],
+        ]
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = [executor.submit(self.run_group, group) for group in groups]
+            test_results = []
+            for future in futures:
+                for name, result, output in future.result():
+                    sys.stdout.write(output)
+                    sys.stdout.flush()
+                    test_results.append((name, result))
+        test_results.append(config_result)
+        
+        test_results.append(("Multiple Servers", self.test_multiple_servers()))
         self.stop_server()
         
-        # Run config error tests (these should fail to start)
-        test_results.append(("Config Errors", self.test_config_errors()))
-        
-        # Restart server for multiple server test
-        if self.start_server():
-            test_results.append(("Multiple Servers", self.test_multiple_servers()))
-            self.stop_server()
-        
         # Print summary
-        print(f"\n{BLUE}{'='*60}{RESET}")
-        print(f"{BLUE}{'TEST SUMMARY':^60}{RESET}")
-        print(f"{BLUE}{'='*60}{RESET}")
+        self.log(f"\n{BLUE}{'='*60}{RESET}")
+        self.log(f"{BLUE}{'TEST SUMMARY':^60}{RESET}")
+        self.log(f"{BLUE}{'='*60}{RESET}")
         
         passed = sum(1 for _, result in test_results if result)
         total = len(test_results)
         
         for name, result in test_results:
             status = f"{GREEN}PASS{RESET}" if result else f"{RED}FAIL{RESET}"
-            print(f"{name:.<40} {status}")
+            self.log(f"{name:.<40} {status}")
         
-        print(f"\n{BLUE}Total: {passed}/{total} tests passed{RESET}")
+        self.log(f"\n{BLUE}Total: {passed}/{total} tests passed{RESET}")
         
         if passed == total:
-            print(f"\n{GREEN}{'🎉 ALL TESTS PASSED! 🎉':^60}{RESET}")
+            self.log(f"\n{GREEN}{'🎉 ALL TESTS PASSED! 🎉':^60}{RESET}")
         elif passed >= total * 0.7:
-            print(f"\n{YELLOW}{'Most tests passed, check failures above':^60}{RESET}")
+            self.log(f"\n{YELLOW}{'Most tests passed, check failures above':^60}{RESET}")
         else:
-            print(f"\n{RED}{'Multiple tests failed, review implementation':^60}{RESET}")
+            self.log(f"\n{RED}{'Multiple tests failed, review implementation':^60}{RESET}")
+        self.flush_log()
 
 if __name__ == "__main__":
     # Parse command line arguments
     binary_path = sys.argv[1] if len(sys.argv) > 1 else "./webserv"
     config_path = sys.argv[2] if len(sys.argv) > 2 else "config/example.conf"
     
-    # Check if binary exists
-    if not os.path.exists(binary_path):
-        print(f"{RED}Error: Binary '{binary_path}' not found{RESET}")
-        print(f"Usage: {sys.argv[0]} [webserv_binary] [config_file]")
-        sys.exit(1)
-    
-    if not os.path.exists(config_path):
+    # Only the server reads the config, opening it here reports a bad path up front
+    try:
+        with open(config_path):
+            pass
+    except OSError:
         print(f"{RED}Error: Config file '{config_path}' not found{RESET}")
         print(f"Usage: {sys.argv[0]} [webserv_binary] [config_file]")
         sys.exit(1)
@@ -504,9 +677,19 @@ if __name__ == "__main__":
     tester = WebservGeneralTester(binary_path, config_path)
     try:
         tester.run_all_tests()
+    except FileNotFoundError:
+        # Raised by the first Popen of the binary
+        tester.flush_log()
+        print(f"{RED}Error: Binary '{binary_path}' not found{RESET}")
+        print(f"Usage: {sys.argv[0]} [webserv_binary] [config_file]")
+        sys.exit(1)
     except KeyboardInterrupt:
+        tester.flush_log()
         print(f"\n{YELLOW}Tests interrupted by user{RESET}")
         tester.stop_server()
+        tester.flush_log()
     except Exception as e:
+        tester.flush_log()
         print(f"\n{RED}Unexpected error: {e}{RESET}")
-        tester.stop_server()
\ No newline at end of file
+        tester.stop_server()
+        tester.flush_log()
\ No newline at end of file